@@ -8,6 +8,7 @@ def add_argument(parser):
     parser.add_argument("--rot_threshold", type=float, default=0.05)
     parser.add_argument("--discrete_grip", type=str2bool, default=False)
     parser.add_argument("--easy_init", type=str2bool, default=False)
+    parser.add_argument("--verbose_env", type=str2bool, default=False)
 
     # environment offsets
     parser.add_argument("--above_leg_z", type=float, default=0.05)
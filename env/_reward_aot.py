@@ -0,0 +1,41 @@
+"""
+Ahead-of-time compilation of the dense reward kernels.
+
+Every rollout worker pays numba's JIT compilation cost for the kernels
+in env._reward_kernels at env construction. Compiling them once with
+numba.pycc moves that cost to build time:
+
+    python -m env._reward_aot
+
+writes a `_reward_kernels_aot` extension module next to this file.
+env._reward_kernels imports it automatically when present and falls
+back to the @njit kernels when it is missing.
+"""
+import os
+
+from numba.pycc import CC
+
+from env import _reward_kernels
+
+cc = CC("_reward_kernels_aot")
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+# use the plain-Python sources captured before any existing extension
+# rebinds the public names, so rebuilds work with a stale build present
+cc.export("cos3", "f8(f8[:], f8[:])")(_reward_kernels._py_cos3)
+cc.export(
+    "fine_reward_kernel",
+    "UniTuple(f8, 6)(f8[:], f8[:], f8[:], f8[:], f8, b1, f8, f8)",
+)(_reward_kernels._py_fine_reward_kernel)
+cc.export(
+    "move_reward_kernel",
+    "UniTuple(f8, 4)(f8[:], f8[:], f8[:], f8[:], f8, b1, f8, f8)",
+)(_reward_kernels._py_move_reward_kernel)
+cc.export(
+    "stable_grip_kernel", "UniTuple(f8, 3)(f8[:], f8[:], f8[:], f8)"
+)(_reward_kernels._py_stable_grip_kernel)
+
+
+if __name__ == "__main__":
+    cc.compile()
@@ -0,0 +1,168 @@
+"""
+Numba-compiled kernels for the dense reward step path.
+
+The reward math operates on tiny 3-vectors, so interpreter and NumPy
+dispatch overhead dominates the actual arithmetic. These kernels compile
+the fused distance / cosine-similarity computations to native code.
+numba is optional: without it the kernels run as plain Python with the
+same signatures.
+"""
+import math
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+
+    def njit(*args, **kwargs):
+        """Fallback no-op decorator when numba is not installed"""
+
+        def decorator(func):
+            return func
+
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return decorator
+
+
+@njit(cache=True, fastmath=True)
+def cos3(a, b):
+    """Cosine similarity of two 3-vectors"""
+    dot = a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+    na = math.sqrt(a[0] * a[0] + a[1] * a[1] + a[2] * a[2])
+    nb = math.sqrt(b[0] * b[0] + b[1] * b[1] + b[2] * b[2])
+    return dot / na / nb
+
+
+@njit(cache=True, fastmath=True)
+def fine_reward_kernel(
+    leg_site, table_site, leg_up, table_up, prev_pos_dist, diff_rew, pos_coef, rot_coef
+):
+    """
+    Fused position + angular math of `_move_leg_fine_reward`.
+    Returns (pos_rew, ang_rew, move_pos_distance, move_ang_dist, proj_t, proj_l).
+    """
+    dx = table_site[0] - leg_site[0]
+    dy = table_site[1] - leg_site[1]
+    dz = table_site[2] - leg_site[2]
+    move_pos_distance = math.sqrt(dx * dx + dy * dy) + abs(dz)
+    if diff_rew:
+        pos_rew = (prev_pos_dist - move_pos_distance) * pos_coef * 10
+    else:
+        pos_rew = -move_pos_distance * pos_coef
+
+    # the three cosine similarities share their vector norms, so evaluate
+    # them in one pass: cos(leg_up, table_up), cos(table_up, leg - table)
+    # and cos(-leg_up, table - leg)
+    n_leg = math.sqrt(
+        leg_up[0] * leg_up[0] + leg_up[1] * leg_up[1] + leg_up[2] * leg_up[2]
+    )
+    n_table = math.sqrt(
+        table_up[0] * table_up[0]
+        + table_up[1] * table_up[1]
+        + table_up[2] * table_up[2]
+    )
+    n_rel = math.sqrt(dx * dx + dy * dy + dz * dz)
+    dot_leg_table = leg_up[0] * table_up[0] + leg_up[1] * table_up[1] + leg_up[2] * table_up[2]
+    dot_table_rel = table_up[0] * dx + table_up[1] * dy + table_up[2] * dz
+    dot_leg_rel = leg_up[0] * dx + leg_up[1] * dy + leg_up[2] * dz
+    move_ang_dist = dot_leg_table / (n_leg * n_table)
+    proj_t = -dot_table_rel / (n_table * n_rel)
+    proj_l = -dot_leg_rel / (n_leg * n_rel)
+
+    ang_rew = (move_ang_dist - 1) * rot_coef
+    ang_rew += (-proj_t - 1) * rot_coef
+    ang_rew += (-proj_l - 1) * rot_coef
+    return pos_rew, ang_rew, move_pos_distance, move_ang_dist, proj_t, proj_l
+
+
+@njit(cache=True, fastmath=True)
+def move_reward_kernel(
+    leg_site, table_site, leg_up, table_up, prev_pos_dist, diff_rew, pos_coef, rot_coef
+):
+    """
+    Fused position + angular math of `_move_leg_reward`; the target is
+    0.05 above the table site.
+    Returns (pos_rew, ang_rew, move_pos_distance, move_ang_dist).
+    """
+    dx = table_site[0] - leg_site[0]
+    dy = table_site[1] - leg_site[1]
+    dz = table_site[2] + 0.05 - leg_site[2]
+    move_pos_distance = math.sqrt(dx * dx + dy * dy + dz * dz)
+    if diff_rew:
+        pos_rew = (prev_pos_dist - move_pos_distance) * pos_coef * 10
+    else:
+        pos_rew = -move_pos_distance * pos_coef
+
+    # inlined cosine keeps the kernel self-contained for AOT compilation
+    dot = (
+        leg_up[0] * table_up[0] + leg_up[1] * table_up[1] + leg_up[2] * table_up[2]
+    )
+    n_leg = math.sqrt(
+        leg_up[0] * leg_up[0] + leg_up[1] * leg_up[1] + leg_up[2] * leg_up[2]
+    )
+    n_table = math.sqrt(
+        table_up[0] * table_up[0]
+        + table_up[1] * table_up[1]
+        + table_up[2] * table_up[2]
+    )
+    move_ang_dist = dot / (n_leg * n_table)
+    ang_rew = (move_ang_dist - 1) * rot_coef
+    return pos_rew, ang_rew, move_pos_distance, move_ang_dist
+
+
+@njit(cache=True, fastmath=True)
+def stable_grip_kernel(eef_up, eef_forward, grasp_vec, rot_coef):
+    """
+    Fused angular math of `_stable_grip_reward`.
+    Returns (rew, eef_up_grasp_dist, eef_forward_grasp_dist).
+    """
+    # cosine against the constant [0, 0, -1] reduces to a negated z
+    up_norm = math.sqrt(
+        eef_up[0] * eef_up[0] + eef_up[1] * eef_up[1] + eef_up[2] * eef_up[2]
+    )
+    eef_up_grasp_dist = -eef_up[2] / up_norm
+    eef_up_grasp_rew = rot_coef / 3 * (eef_up_grasp_dist - 1)
+
+    # 2-D cosine between grip forward and the grasp vector
+    dot = eef_forward[0] * grasp_vec[0] + eef_forward[1] * grasp_vec[1]
+    nf = math.sqrt(eef_forward[0] * eef_forward[0] + eef_forward[1] * eef_forward[1])
+    ng = math.sqrt(grasp_vec[0] * grasp_vec[0] + grasp_vec[1] * grasp_vec[1])
+    eef_forward_grasp_dist = dot / nf / ng
+    eef_forward_grasp_rew = (abs(eef_forward_grasp_dist) - 1) * rot_coef
+
+    rew = eef_up_grasp_rew + eef_forward_grasp_rew
+    return rew, eef_up_grasp_dist, eef_forward_grasp_dist
+
+
+# plain-Python sources for the AOT build (see _reward_aot.py), captured
+# before the import below can rebind the public names to compiled
+# builtins that cc.export cannot recompile
+_py_cos3 = getattr(cos3, "py_func", cos3)
+_py_fine_reward_kernel = getattr(fine_reward_kernel, "py_func", fine_reward_kernel)
+_py_move_reward_kernel = getattr(move_reward_kernel, "py_func", move_reward_kernel)
+_py_stable_grip_kernel = getattr(stable_grip_kernel, "py_func", stable_grip_kernel)
+
+# prefer the ahead-of-time build when it exists (see _reward_aot.py); it
+# skips per-process JIT compilation in rollout workers
+try:
+    from env._reward_kernels_aot import (  # noqa: F401, F811
+        cos3,
+        fine_reward_kernel,
+        move_reward_kernel,
+        stable_grip_kernel,
+    )
+except ImportError:
+    pass
+
+
+def warmup():
+    """Trigger JIT compilation once so env construction pays the cost up
+    front instead of the first step. A no-op cheap call with the AOT
+    build.
+    """
+    v = np.ones(3, dtype=np.float64)
+    fine_reward_kernel(v, v + 1, v, v, 0.0, True, 1.0, 1.0)
+    move_reward_kernel(v, v + 1, v, v, 0.0, True, 1.0, 1.0)
+    stable_grip_kernel(v, v, v, 1.0)
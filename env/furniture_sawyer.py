@@ -254,6 +254,34 @@ class FurnitureSawyerEnv(FurnitureEnv):
 
         return touch_left_finger, touch_right_finger
 
+    def _finger_contact_by_id(self, body_id):
+        """
+        Returns if left, right fingers contact with body @body_id.
+        Integer-only variant of _finger_contact for hot paths, avoiding
+        per-contact body_id2name lookups.
+        """
+        touch_left_finger = False
+        touch_right_finger = False
+        l_finger_geom_ids = self.l_finger_geom_ids["right"]
+        r_finger_geom_ids = self.r_finger_geom_ids["right"]
+        geom_bodyid = self.sim.model.geom_bodyid
+        for j in range(self.sim.data.ncon):
+            c = self.sim.data.contact[j]
+            body1 = geom_bodyid[c.geom1]
+            body2 = geom_bodyid[c.geom2]
+
+            if c.geom1 in l_finger_geom_ids and body2 == body_id:
+                touch_left_finger = True
+            if c.geom2 in l_finger_geom_ids and body1 == body_id:
+                touch_left_finger = True
+
+            if c.geom1 in r_finger_geom_ids and body2 == body_id:
+                touch_right_finger = True
+            if c.geom2 in r_finger_geom_ids and body1 == body_id:
+                touch_right_finger = True
+
+        return touch_left_finger, touch_right_finger
+
 
 def main():
     from config import create_parser
@@ -1,15 +1,75 @@
+import math
+from enum import IntEnum
 from typing import Tuple
 
 import numpy as np
 import yaml
 import os
 
-import env.transform_utils as T
+from env import _reward_kernels
 from env.furniture_sawyer import FurnitureSawyerEnv
 from env.models import furniture_name2id
 from util import PrettySafeLoader
 from util.logger import logger
 
+# Constant z offsets used by the reward terms; hoisted so the step path
+# does not coerce a fresh Python list on every addition.
+_OFFSET_Z_P05 = np.array([0.0, 0.0, 0.05])
+_OFFSET_Z_M015 = np.array([0.0, 0.0, -0.015])
+
+# Indices into the per-step site position cache (see _refresh_site_cache).
+_GRIPTIP = 0
+_GRIP = 1
+_LGRIPTIP = 2
+_RGRIPTIP = 3
+_LEG_SITE = 4
+_TABLE_SITE = 5
+_G1 = 6
+_G2 = 7
+_N_CACHED_SITES = 8
+
+# Indices into the per-subtask reward state array (see _rew_state): the
+# previous-step distances used by the difference rewards, packed into one
+# contiguous block instead of scattered float attributes.
+_PREV_EEF_ABOVE = 0
+_PREV_EEF_LEG = 1
+_PREV_MOVE_POS = 2
+_PREV_MOVE_ANG = 3
+_PREV_GRASP = 4
+_N_REW_STATE = 5
+
+# Indices into the per-step site rotation-vector cache.
+_GRIP_UP = 0
+_GRIP_FORWARD = 1
+_LEG_UP = 2
+_TABLE_UP = 3
+_N_CACHED_VECS = 4
+
+
+def _dist3(a, b) -> float:
+    """Euclidean distance between two 3-D points with scalar math"""
+    dx = a[0] - b[0]
+    dy = a[1] - b[1]
+    dz = a[2] - b[2]
+    return math.sqrt(dx * dx + dy * dy + dz * dz)
+
+
+def _xy_z_dist(a, b) -> Tuple[float, float]:
+    """Planar xy distance and absolute z gap between two points, computed
+    with scalar math to avoid NumPy dispatch on tiny arrays.
+    """
+    return math.hypot(a[0] - b[0], a[1] - b[1]), abs(a[2] - b[2])
+
+
+class Phase(IntEnum):
+    """Phases of one leg-attach subtask, in execution order"""
+
+    MOVE_EEF_ABOVE_LEG = 0
+    LOWER_EEF_TO_LEG = 1
+    GRASP_LEG = 2
+    MOVE_LEG = 3
+    MOVE_LEG_FINE = 4
+
 
 class FurnitureSawyerDenseRewardEnv(FurnitureSawyerEnv):
     """
@@ -49,9 +109,25 @@ class FurnitureSawyerDenseRewardEnv(FurnitureSawyerEnv):
 
         self._num_connect_steps = 0
         self._discrete_grip = config.discrete_grip
-        self._grip_open_phases = set(["move_eef_above_leg", "lower_eef_to_leg"])
-        self._phases = ["move_eef_above_leg", "lower_eef_to_leg", "grasp_leg"]
-        self._phases.extend(["move_leg", "move_leg_fine"])
+        self._verbose = getattr(config, "verbose_env", False)
+        self._grip_open_phases = frozenset(
+            {Phase.MOVE_EEF_ABOVE_LEG, Phase.LOWER_EEF_TO_LEG}
+        )
+        self._phases = tuple(Phase)
+        # grip-open flag precomputed per phase index; the trailing False
+        # covers the post-connect phase index past the last phase
+        self._grip_open_by_phase = tuple(
+            p in self._grip_open_phases for p in self._phases
+        ) + (False,)
+        # phase handlers bound once and dispatched by integer phase index;
+        # each returns (phase_reward, phase_bonus, done)
+        self._phase_handlers = (
+            self._phase_move_eef_above_leg,
+            self._phase_lower_eef_to_leg,
+            self._phase_grasp_leg,
+            self._phase_move_leg,
+            self._phase_move_leg_fine,
+        )
         # Load the furniture recipe
         fullpath = os.path.join(
             os.path.dirname(__file__), f"../demos/recipes/{config.furniture_name}.yaml"
@@ -60,14 +136,39 @@ class FurnitureSawyerDenseRewardEnv(FurnitureSawyerEnv):
             self._data = data = yaml.load(stream, Loader=PrettySafeLoader)
             self._recipe = data["recipe"]
             self._site_recipe = data["site_recipe"]
-            part = self._recipe[0][0]
-            g1, g2 = f"{part}_ltgt_site0", f"{part}_rtgt_site0"
-            if "grip_site_recipe" in data:
-                g1, g2 = data["grip_site_recipe"][0]
-            self._get_leg_grasp_pos = (
-                lambda x: (self._get_pos(g1) + self._get_pos(g2)) / 2
-            )
-            self._get_leg_grasp_vector = lambda x: self._get_pos(g1) - self._get_pos(g2)
+
+        # pre-resolve the whole subtask schedule so subtask transitions
+        # only unpack a tuple instead of re-reading the recipe dicts
+        grip_site_recipe = self._data.get("grip_site_recipe", [])
+        subtask_plan = []
+        for i, (leg, table) in enumerate(self._recipe):
+            leg_site, table_site = self._site_recipe[i]
+            g1, g2 = f"{leg}_ltgt_site0", f"{leg}_rtgt_site0"
+            if i < len(grip_site_recipe):
+                g1, g2 = grip_site_recipe[i]
+            subtask_plan.append((leg, table, leg_site, table_site, g1, g2))
+        self._subtask_plan = tuple(subtask_plan)
+
+        # preallocated caches of reward-relevant site positions and vectors,
+        # refreshed once per step (see _refresh_site_cache)
+        self._site_cache = np.empty((_N_CACHED_SITES, 3), dtype=np.float64)
+        self._vec_cache = np.empty((_N_CACHED_VECS, 3), dtype=np.float64)
+        # per-subtask reward state (previous-step distances), see the
+        # _PREV_* indices at module top
+        self._rew_state = np.zeros(_N_REW_STATE, dtype=np.float64)
+        # reusable 6-vectors for _get_gripper_pos/_get_fingertip_pos;
+        # valid until the next step
+        self._gripper_pos_buf = np.empty(6, dtype=np.float64)
+        self._fingertip_pos_buf = np.empty(6, dtype=np.float64)
+        # scratch buffer for the discretized action, sized on first _step
+        self._ac_buf = None
+        # grip command applied by the latest _step, read by _gripper_penalty
+        self._last_grip_ac = 0.0
+        # reusable info dict; sub-rewards write into it in-place so the
+        # step path does not merge several fresh dicts
+        self._info_buf = {}
+        # pay the JIT compile cost now rather than on the first step
+        _reward_kernels.warmup()
 
     def _reset_reward_variables(self):
         self._subtask_step = 0
@@ -84,34 +185,68 @@ class FurnitureSawyerDenseRewardEnv(FurnitureSawyerEnv):
     def _update_reward_variables(self, subtask_step):
         """Update the reward variables wrt subtask step"""
         self._phase_i = 0
-        self._leg, self._table = self._recipe[subtask_step]
-        self._leg_site, self._table_site = self._site_recipe[subtask_step]
+        (
+            self._leg,
+            self._table,
+            self._leg_site,
+            self._table_site,
+            self._g1_name,
+            self._g2_name,
+        ) = self._subtask_plan[subtask_step]
         # updates the observation to the current objects of interest
         self._subtask_part1 = self._object_name2id[self._leg]
         self._subtask_part2 = self._object_name2id[self._table]
+        # body id for the int-only contact scan on the step path
+        self._leg_body_id = self.sim.model.body_name2id(self._leg)
         self._touched = False
         self._leg_lift = False
         self._init_leg_pos = self._get_pos(self._leg)
         self._leg_fine_aligned = False
 
+        # resolve all site names once so the step path can gather positions
+        # with a single indexed read instead of per-name lookups
+        site_name2id = self.sim.model.site_name2id
+        self._cache_site_ids = np.array(
+            [
+                site_name2id("griptip_site"),
+                site_name2id("grip_site"),
+                site_name2id("lgriptip_site"),
+                site_name2id("rgriptip_site"),
+                site_name2id(self._leg_site),
+                site_name2id(self._table_site),
+                site_name2id(self._g1_name),
+                site_name2id(self._g2_name),
+            ],
+            dtype=np.intp,
+        )
+        self._vec_site_ids = np.array(
+            [
+                site_name2id("grip_site"),
+                site_name2id(self._leg_site),
+                site_name2id(self._table_site),
+            ],
+            dtype=np.intp,
+        )
+        self._refresh_site_cache()
+
         if self._diff_rew:
-            eef_pos = self._get_pos("griptip_site")
-            leg_pos = self._init_leg_pos + [0, 0, 0.05]
-            xy_distance = np.linalg.norm(eef_pos[:2] - leg_pos[:2])
-            z_distance = np.abs(eef_pos[2] - leg_pos[2])
-            self._prev_eef_above_leg_distance = xy_distance + z_distance
-
-        if subtask_step == 0:  # don't need to update getters
-            return
-        self._recipe = self._data["recipe"]
-        self._site_recipe = self._data["site_recipe"]
-        g1, g2 = f"{self._leg}_ltgt_site0", f"{self._leg}_rtgt_site0"
-        if "grip_site_recipe" in self._data and self._subtask_step < len(
-            self._data["grip_site_recipe"]
-        ):
-            g1, g2 = self._data["grip_site_recipe"][self._subtask_step]
-        self._get_leg_grasp_pos = lambda x: (self._get_pos(g1) + self._get_pos(g2)) / 2
-        self._get_leg_grasp_vector = lambda x: self._get_pos(g1) - self._get_pos(g2)
+            eef_pos = self._site_cache[_GRIPTIP]
+            leg_pos = self._init_leg_pos + _OFFSET_Z_P05
+            xy_distance, z_distance = _xy_z_dist(eef_pos, leg_pos)
+            self._rew_state[_PREV_EEF_ABOVE] = xy_distance + z_distance
+
+    def _refresh_site_cache(self):
+        """Gather all reward-relevant site positions and rotation vectors
+        into contiguous buffers with one indexed read per buffer.
+        """
+        np.take(
+            self.sim.data.site_xpos, self._cache_site_ids, axis=0, out=self._site_cache
+        )
+        xmat = self.sim.data.site_xmat[self._vec_site_ids]  # (3, 9) row-major 3x3s
+        self._vec_cache[_GRIP_UP] = xmat[0, 2::3]
+        self._vec_cache[_GRIP_FORWARD] = xmat[0, 1::3]
+        self._vec_cache[_LEG_UP] = xmat[1, 2::3]
+        self._vec_cache[_TABLE_UP] = xmat[2, 2::3]
 
     def _reset(self, furniture_id=None, background=None):
         super()._reset(furniture_id, background)
@@ -121,10 +256,18 @@ class FurnitureSawyerDenseRewardEnv(FurnitureSawyerEnv):
         """
         Takes a simulation step with @a and computes reward.
         """
-        # discretize gripper action
+        # discretize gripper action into a persistent scratch buffer
+        # instead of copying the action every step
         if self._discrete_grip:
-            a = a.copy()
-            a[-2] = -1 if a[-2] < 0 else 1
+            if self._ac_buf is None:
+                self._ac_buf = np.empty_like(a)
+            np.copyto(self._ac_buf, a)
+            grip = 1.0 if a[-2] >= 0 else -1.0
+            self._ac_buf[-2] = grip
+            a = self._ac_buf
+        else:
+            grip = float(a[-2])
+        self._last_grip_ac = grip
 
         ob, _, done, _ = super(FurnitureSawyerEnv, self)._step(a)
         reward, done, info = self._compute_reward(a)
@@ -149,169 +292,204 @@ class FurnitureSawyerDenseRewardEnv(FurnitureSawyerEnv):
         """
         phase_bonus = reward = 0
         done = False
-        info = {"subtask": self._subtask_step}
-        phase = self._phases[self._phase_i]
-
-        ctrl_penalty, ctrl_info = self._ctrl_penalty(ac)
-        stable_grip_rew, sg_info = self._stable_grip_reward()
-        grip_penalty, grip_info = self._gripper_penalty(ac)
-
-        # detect early success
+        info = self._info_buf
+        info.clear()
+        info["subtask"] = self._subtask_step
+        phase_i = self._phase_i
+        self._refresh_site_cache()
+
+        ctrl_penalty = self._ctrl_penalty(ac, info)
+        stable_grip_rew = self._stable_grip_reward(info)
+        grip_penalty = self._gripper_penalty(info)
+
+        # detect early success; the contact scan runs behind the cheap
+        # alignment gate and is shared with the phase handlers below
         info["is_aligned"] = int(self._is_aligned(self._leg_site, self._table_site))
-        left, right = self._finger_contact(self._leg)
-        if phase != "move_leg_fine" and info["is_aligned"] and left and right:
-            phase_info = {}
+        leg_touched = None
+        if (
+            phase_i != Phase.MOVE_LEG_FINE
+            and phase_i < len(self._phase_handlers)
+            and info["is_aligned"]
+        ):
+            leg_touched = self._leg_touched()
+        if leg_touched:
             phase_reward = 300
-            phase_info["connect_rew"] = ac[-1] * 300
-            reward += phase_info["connect_rew"]
-            phase_info["connect_succ"] = int(info["is_aligned"] and ac[-1] > 0)
-            if phase_info["connect_succ"]:
+            info["connect_rew"] = ac[-1] * 300
+            reward += info["connect_rew"]
+            info["connect_succ"] = int(info["is_aligned"] and ac[-1] > 0)
+            if info["connect_succ"]:
                 phase_reward = 20000
-                self._phase_i = 5
-                print(f"Early Connected!!!")
-                # update reward variables for next attachment
-                done = self._success = self._set_next_subtask()
-        elif phase == "move_eef_above_leg":
-            phase_reward, phase_info = self._move_eef_above_leg_reward()
-            if phase_info[f"{phase}_succ"] and sg_info["stable_grip_succ"]:
-                print(f"DONE WITH PHASE {phase}")
-                self._phase_i += 1
-                phase_bonus = 5
-                eef_pos = self._get_gripper_pos()
-                leg_pos1 = self._get_pos(self._leg) + [0, 0, -0.015]
-                leg_pos2 = leg_pos1 + [0, 0, 0.03]
-                leg_pos = np.concatenate([leg_pos1, leg_pos2])
-                xy_distance = np.linalg.norm(eef_pos[:2] - leg_pos[:2])
-                z_distance = np.abs(eef_pos[2] - leg_pos[2])
-                self._prev_eef_leg_distance = xy_distance + z_distance
-        elif phase == "lower_eef_to_leg":
-            phase_reward, phase_info = self._lower_eef_to_leg_reward()
-            if phase_info[f"{phase}_succ"] and sg_info["stable_grip_succ"]:
-                print(f"DONE WITH PHASE {phase}")
-                phase_bonus = 50
-                self._phase_i += 1
-                self._prev_grasp_leg_rew = ac[-2]
-        elif phase == "grasp_leg":
-            phase_reward, phase_info = self._grasp_leg_reward(ac)
-            if phase_info[f"grasp_leg_succ"]:
-                print(f"DONE WITH PHASE {phase}")
-                self._phase_i += 1
-                phase_bonus = self._phase_bonus
-                above_table_site = self._get_pos(self._table_site)
-                above_table_site[2] += 0.05
-                leg_site = self._get_pos(self._leg_site)
-                self._prev_move_pos_distance = np.linalg.norm(
-                    above_table_site - leg_site
-                )
-                leg_up = self._get_up_vector(self._leg_site)
-                table_up = self._get_up_vector(self._table_site)
-                self._prev_move_ang_dist = T.cos_siml(leg_up, table_up)
-        elif phase == "move_leg":
-            phase_reward, phase_info = self._move_leg_reward()
-            if not phase_info["touch"]:
-                print("Dropped leg")
-                phase_bonus = -100
-                done = True
-            if phase_info[f"{phase}_succ"]:
-                print(f"DONE WITH PHASE {phase}")
-                self._phase_i += 1
-                phase_bonus = self._phase_bonus * 4
-                table_site = self._get_pos(self._table_site)
-                leg_site = self._get_pos(self._leg_site)
-                self._prev_move_pos_distance = np.linalg.norm(table_site - leg_site)
-
-                leg_up = self._get_up_vector(self._leg_site)
-                table_up = self._get_up_vector(self._table_site)
-                self._prev_move_ang_dist = T.cos_siml(leg_up, table_up)
-        elif phase == "move_leg_fine":
-            phase_reward, phase_info = self._move_leg_fine_reward(ac)
-            if not phase_info["touch"]:
-                print("Dropped leg")
-                phase_bonus = -125
-                done = True
-            if phase_info["connect_succ"]:
-                phase_bonus = 20000
-                self._phase_i += 1
-                print(f"CONNECTED!!!!!!!!!!!!!!!!!!!!!!")
+                self._phase_i = len(self._phases)
+                if self._verbose:
+                    logger.info("Early connected")
                 # update reward variables for next attachment
                 done = self._success = self._set_next_subtask()
+        elif phase_i < len(self._phase_handlers):
+            phase_reward, phase_bonus, done = self._phase_handlers[phase_i](
+                ac, info, leg_touched
+            )
         else:
-            phase_reward, phase_info = 0, {}
+            phase_reward = 0
             done = True
 
         reward += ctrl_penalty + phase_reward + stable_grip_rew
         reward += grip_penalty + phase_bonus
         info["phase_bonus"] = phase_bonus
-        info = {**info, **ctrl_info, **phase_info, **sg_info, **grip_info}
         # log phase if last frame
         if self._episode_length == self._env_config["max_episode_steps"] - 1 or done:
             info["phase"] = self._phase_i
         return reward, done, info
 
-    def _move_eef_above_leg_reward(self) -> Tuple[float, dict]:
+    def _phase_move_eef_above_leg(self, ac, info, leg_touched) -> Tuple[float, float, bool]:
+        phase_reward = self._move_eef_above_leg_reward(info)
+        phase_bonus = 0
+        if info["move_eef_above_leg_succ"] and info["stable_grip_succ"]:
+            if self._verbose:
+                logger.info("Done with phase move_eef_above_leg")
+            self._phase_i += 1
+            phase_bonus = 5
+            # only griptip xy/z enter the distance
+            eef_pos = self._site_cache[_GRIPTIP]
+            leg_pos = self._get_pos(self._leg) + _OFFSET_Z_M015
+            xy_distance, z_distance = _xy_z_dist(eef_pos, leg_pos)
+            self._rew_state[_PREV_EEF_LEG] = xy_distance + z_distance
+        return phase_reward, phase_bonus, False
+
+    def _phase_lower_eef_to_leg(self, ac, info, leg_touched) -> Tuple[float, float, bool]:
+        phase_reward = self._lower_eef_to_leg_reward(info)
+        phase_bonus = 0
+        if info["lower_eef_to_leg_succ"] and info["stable_grip_succ"]:
+            if self._verbose:
+                logger.info("Done with phase lower_eef_to_leg")
+            phase_bonus = 50
+            self._phase_i += 1
+            self._rew_state[_PREV_GRASP] = ac[-2]
+        return phase_reward, phase_bonus, False
+
+    def _phase_grasp_leg(self, ac, info, leg_touched) -> Tuple[float, float, bool]:
+        if leg_touched is None:
+            leg_touched = self._leg_touched()
+        phase_reward = self._grasp_leg_reward(ac, info, leg_touched)
+        phase_bonus = 0
+        if info["grasp_leg_succ"]:
+            if self._verbose:
+                logger.info("Done with phase grasp_leg")
+            self._phase_i += 1
+            phase_bonus = self._phase_bonus
+            above_table_site = self._site_cache[_TABLE_SITE] + _OFFSET_Z_P05
+            leg_site = self._site_cache[_LEG_SITE]
+            self._rew_state[_PREV_MOVE_POS] = _dist3(above_table_site, leg_site)
+            leg_up = self._vec_cache[_LEG_UP]
+            table_up = self._vec_cache[_TABLE_UP]
+            self._rew_state[_PREV_MOVE_ANG] = _reward_kernels.cos3(leg_up, table_up)
+        return phase_reward, phase_bonus, False
+
+    def _phase_move_leg(self, ac, info, leg_touched) -> Tuple[float, float, bool]:
+        if leg_touched is None:
+            leg_touched = self._leg_touched()
+        phase_reward = self._move_leg_reward(info, leg_touched)
+        phase_bonus = 0
+        done = False
+        if not info["touch"]:
+            if self._verbose:
+                logger.info("Dropped leg")
+            phase_bonus = -100
+            done = True
+        if info["move_leg_succ"]:
+            if self._verbose:
+                logger.info("Done with phase move_leg")
+            self._phase_i += 1
+            phase_bonus = self._phase_bonus * 4
+            table_site = self._site_cache[_TABLE_SITE]
+            leg_site = self._site_cache[_LEG_SITE]
+            self._rew_state[_PREV_MOVE_POS] = _dist3(table_site, leg_site)
+
+            leg_up = self._vec_cache[_LEG_UP]
+            table_up = self._vec_cache[_TABLE_UP]
+            self._rew_state[_PREV_MOVE_ANG] = _reward_kernels.cos3(leg_up, table_up)
+        return phase_reward, phase_bonus, done
+
+    def _phase_move_leg_fine(self, ac, info, leg_touched) -> Tuple[float, float, bool]:
+        leg_touched = self._leg_touched()
+        phase_reward = self._move_leg_fine_reward(ac, info, leg_touched)
+        phase_bonus = 0
+        done = False
+        if not info["touch"]:
+            if self._verbose:
+                logger.info("Dropped leg")
+            phase_bonus = -125
+            done = True
+        if info["connect_succ"]:
+            phase_bonus = 20000
+            self._phase_i += 1
+            if self._verbose:
+                logger.info("Connected")
+            # update reward variables for next attachment
+            done = self._success = self._set_next_subtask()
+        return phase_reward, phase_bonus, done
+
+    def _move_eef_above_leg_reward(self, info) -> float:
         """
         Moves the eef above the leg and rotates the wrist.
         Negative euclidean distance between eef xy and leg xy.
 
         Return negative eucl distance
         """
-        eef_pos = self._get_pos("griptip_site")
-        leg_pos = self._get_leg_grasp_pos(self._leg) + [0, 0, 0.05]
-        xy_distance = np.linalg.norm(eef_pos[:2] - leg_pos[:2])
-        z_distance = np.abs(eef_pos[2] - leg_pos[2])
+        eef_pos = self._site_cache[_GRIPTIP]
+        leg_pos = self._get_leg_grasp_pos() + _OFFSET_Z_P05
+        xy_distance, z_distance = _xy_z_dist(eef_pos, leg_pos)
         eef_above_leg_distance = xy_distance + z_distance
         if self._diff_rew:
-            offset = self._prev_eef_above_leg_distance - eef_above_leg_distance
+            offset = self._rew_state[_PREV_EEF_ABOVE] - eef_above_leg_distance
             rew = offset * self._pos_dist_coef
-            self._prev_eef_above_leg_distance = eef_above_leg_distance
+            self._rew_state[_PREV_EEF_ABOVE] = eef_above_leg_distance
         else:
             rew = -eef_above_leg_distance * self._pos_dist_coef
-        info = {"eef_above_leg_dist": eef_above_leg_distance, "eef_above_leg_rew": rew}
+        info.update(
+            {"eef_above_leg_dist": eef_above_leg_distance, "eef_above_leg_rew": rew}
+        )
         info["move_eef_above_leg_succ"] = int(xy_distance < 0.015 and z_distance < 0.02)
         # print("-" * 80)
         # print(eef_pos, leg_pos, eef_above_leg_distance)
-        return rew, info
+        return rew
 
-    def _lower_eef_to_leg_reward(self) -> Tuple[float, dict]:
+    def _lower_eef_to_leg_reward(self, info) -> float:
         """
         Moves the eef over the leg and rotates the wrist.
         Negative euclidean distance between eef xy and leg xy.
         Give additional reward for contacting the leg
         Return negative eucl distance
         """
-        info = {}
-        eef_pos = self._get_gripper_pos()
-        leg_pos = self._get_leg_grasp_pos(self._leg) + [0, 0, -0.015]
-        xy_distance = np.linalg.norm(eef_pos[:2] - leg_pos[:2])
-        z_distance = np.abs(eef_pos[2] - leg_pos[2])
+        # only griptip xy/z enter the distance
+        eef_pos = self._site_cache[_GRIPTIP]
+        leg_pos = self._get_leg_grasp_pos() + _OFFSET_Z_M015
+        xy_distance, z_distance = _xy_z_dist(eef_pos, leg_pos)
         eef_leg_distance = xy_distance + z_distance
         if self._diff_rew:
-            offset = self._prev_eef_leg_distance - eef_leg_distance
+            offset = self._rew_state[_PREV_EEF_LEG] - eef_leg_distance
             rew = offset * self._pos_dist_coef
-            self._prev_eef_leg_distance = eef_leg_distance
+            self._rew_state[_PREV_EEF_LEG] = eef_leg_distance
         else:
             rew = -eef_leg_distance * self._pos_dist_coef
         info.update({"eef_leg_dist": eef_leg_distance, "eef_leg_rew": rew})
         info["lower_eef_to_leg_succ"] = int(xy_distance < 0.015 and z_distance < 0.01)
-        return rew, info
+        return rew
 
-    def _grasp_leg_reward(self, ac) -> Tuple[float, dict]:
+    def _grasp_leg_reward(self, ac, info, leg_touched) -> float:
         """
         Grasp the leg, making sure it is in position
         """
-        rew, info = self._lower_eef_to_leg_reward()
+        rew = self._lower_eef_to_leg_reward(info)
         # if eef in correct position, add additional grasping success
         info.update({"grasp_leg_succ": 0, "grasp_leg_rew": 0})
 
-        left, right = self._finger_contact(self._leg)
-        leg_touched = int(left and right)
         info["touch"] = leg_touched
         grasp = ac[-2] > 0.5
         info["grasp_leg_succ"] = int(leg_touched and grasp)
         # closed gripper is 1, want to maximize gripper
-        offset = ac[-2] - self._prev_grasp_leg_rew
+        offset = ac[-2] - self._rew_state[_PREV_GRASP]
         grasp_leg_rew = offset * self._gripper_penalty_coef * 40
-        self._prev_grasp_leg_rew = ac[-2]
+        self._rew_state[_PREV_GRASP] = ac[-2]
         info["grasp_leg_rew"] = grasp_leg_rew
 
         touch_rew = (leg_touched - 1) * self._touch_coef
@@ -323,87 +501,79 @@ class FurnitureSawyerDenseRewardEnv(FurnitureSawyerEnv):
             self._touched = True
         rew += info["grasp_leg_rew"] + touch_rew
 
-        return rew, info
+        return rew
 
-    def _move_leg_reward(self) -> Tuple[float, dict]:
+    def _move_leg_reward(self, info, leg_touched) -> float:
         """
         Coarsely move the leg site over the connsite
         Also give reward for angular alignment
         """
-        left, right = self._finger_contact(self._leg)
-        leg_touched = int(left and right)
         touch_rew = (leg_touched - 1) * self._touch_coef
-        info = {"touch": leg_touched, "touch_rew": touch_rew}
+        info.update({"touch": leg_touched, "touch_rew": touch_rew})
 
-        # calculate position rew
-        above_table_site = self._get_pos(self._table_site) + [0, 0, 0.05]
-        leg_site = self._get_pos(self._leg_site)
-        move_pos_distance = np.linalg.norm(above_table_site - leg_site)
+        # fused position + angular rew
+        leg_site = self._site_cache[_LEG_SITE]
+        pos_rew, ang_rew, move_pos_distance, move_ang_dist = (
+            _reward_kernels.move_reward_kernel(
+                leg_site,
+                self._site_cache[_TABLE_SITE],
+                self._vec_cache[_LEG_UP],
+                self._vec_cache[_TABLE_UP],
+                self._rew_state[_PREV_MOVE_POS],
+                self._diff_rew,
+                self._pos_dist_coef,
+                self._align_rot_dist_coef,
+            )
+        )
         if self._diff_rew:
-            offset = self._prev_move_pos_distance - move_pos_distance
-            pos_rew = offset * self._pos_dist_coef * 10
-            self._prev_move_pos_distance = move_pos_distance
-        else:
-            pos_rew = -move_pos_distance * self._pos_dist_coef
+            self._rew_state[_PREV_MOVE_POS] = move_pos_distance
         info.update({"move_pos_dist": move_pos_distance, "move_pos_rew": pos_rew})
-        # calculate angular rew
-        leg_up = self._get_up_vector(self._leg_site)
-        table_up = self._get_up_vector(self._table_site)
-        move_ang_dist = T.cos_siml(leg_up, table_up)
-        ang_rew = (move_ang_dist - 1) * self._align_rot_dist_coef
         info.update({"move_ang_dist": move_ang_dist, "move_ang_rew": ang_rew})
         info["move_leg_succ"] = int(move_pos_distance < 0.06 and move_ang_dist > 0.85)
         rew = pos_rew + ang_rew
         # give one time reward for lifting the leg
         leg_lift = leg_site[2] > (self._init_leg_pos[2] + 0.002)
         if leg_lift and not self._leg_lift:
-            print("lift leg")
+            if self._verbose:
+                logger.info("Lift leg")
             self._leg_lift = True
             rew += 10
-        return rew, info
+        return rew
 
-    def _move_leg_fine_reward(self, ac) -> Tuple[float, dict]:
+    def _move_leg_fine_reward(self, ac, info, leg_touched) -> float:
         """
         Finely move the leg site over the connsite
         Also give reward for angular alignment
         Also check for connected pieces
         """
-        left, right = self._finger_contact(self._leg)
-        leg_touched = int(left and right)
         touch_rew = (leg_touched - 1) * self._touch_coef
-        info = {"touch": leg_touched, "touch_rew": touch_rew}
-
-        # calculate position rew
-        table_site = self._get_pos(self._table_site)
-        leg_site = self._get_pos(self._leg_site)
-        xy_distance = np.linalg.norm(table_site[:2] - leg_site[:2])
-        z_distance = np.linalg.norm(table_site[2] - leg_site[2])
-        move_pos_distance = xy_distance + z_distance
+        info.update({"touch": leg_touched, "touch_rew": touch_rew})
 
+        # fused position + angular rew
+        pos_rew, ang_rew, move_pos_distance, move_ang_dist, proj_t, proj_l = (
+            _reward_kernels.fine_reward_kernel(
+                self._site_cache[_LEG_SITE],
+                self._site_cache[_TABLE_SITE],
+                self._vec_cache[_LEG_UP],
+                self._vec_cache[_TABLE_UP],
+                self._rew_state[_PREV_MOVE_POS],
+                self._diff_rew,
+                self._fine_pos_dist_coef,
+                self._fine_align_rot_dist_coef,
+            )
+        )
         if self._diff_rew:
-            offset = self._prev_move_pos_distance - move_pos_distance
-            pos_rew = offset * self._fine_pos_dist_coef * 10
-            self._prev_move_pos_distance = move_pos_distance
-        else:
-            pos_rew = -move_pos_distance * self._fine_pos_dist_coef
+            self._rew_state[_PREV_MOVE_POS] = move_pos_distance
         info.update(
             {"move_fine_pos_dist": move_pos_distance, "move_fine_pos_rew": pos_rew}
         )
-        # calculate angular rew
-        leg_up = self._get_up_vector(self._leg_site)
-        table_up = self._get_up_vector(self._table_site)
-        move_ang_dist = T.cos_siml(leg_up, table_up)
-        ang_rew = (move_ang_dist - 1) * self._fine_align_rot_dist_coef
         info["move_fine_ang_dist"] = move_ang_dist
 
         # proj will approach -1 if aligned correctly
-        proj_t = T.cos_siml(table_up, leg_site - table_site)
-        proj_l = T.cos_siml(-leg_up, table_site - leg_site)
         proj_t_rew = (-proj_t - 1) * self._fine_align_rot_dist_coef
         proj_l_rew = (-proj_l - 1) * self._fine_align_rot_dist_coef
         info.update({"proj_t_rew": proj_t_rew, "proj_t": proj_t})
         info.update({"proj_l_rew": proj_l_rew, "proj_l": proj_l})
-        ang_rew += proj_t_rew + proj_l_rew
         info["move_leg_fine_succ"] = int(
             self._is_aligned(self._leg_site, self._table_site)
         )
@@ -418,66 +588,69 @@ class FurnitureSawyerDenseRewardEnv(FurnitureSawyerEnv):
             info["connect_rew"] = ac[-1] * 300
             rew += info["connect_rew"]
         info["connect_succ"] = int(info["move_leg_fine_succ"] and ac[-1] > 0)
-        return rew, info
+        return rew
 
-    def _stable_grip_reward(self) -> Tuple[float, dict]:
+    def _stable_grip_reward(self, info) -> float:
         """
         Makes sure the eef and object axes are aligned
         Prioritize wrist alignment more than vertical alignment
         Returns negative angular distance
         """
-        # up vector of leg and world up vector should be aligned
-        eef_up = self._get_up_vector("grip_site")
-        eef_up_grasp_dist = T.cos_siml(eef_up, [0, 0, -1])
-        eef_up_grasp_rew = self._rot_dist_coef / 3 * (eef_up_grasp_dist - 1)
-
-        grasp_vec = self._get_leg_grasp_vector(self._leg_site)
-        # up vector of leg and forward vector of grip site should be parallel (close to -1 or 1)
-        eef_forward = self._get_forward_vector("grip_site")
-        eef_forward_grasp_dist = T.cos_siml(eef_forward[:2], grasp_vec[:2])
-        eef_forward_grasp_rew = (
-            np.abs(eef_forward_grasp_dist) - 1
-        ) * self._rot_dist_coef
-        info = {
-            "eef_up_grasp_dist": eef_up_grasp_dist,
-            "eef_up_grasp_rew": eef_up_grasp_rew,
-            "eef_forward_grasp_dist": eef_forward_grasp_dist,
-            "eef_forward_grasp_rew": eef_forward_grasp_rew,
-        }
-        # print(f"Close to 1; eef_up_grasp_siml: {eef_up_grasp_dist}")
-        # print(f"Close to 1/-1; eef_forward_grasp_dist: {eef_forward_grasp_dist}")
-        rew = eef_up_grasp_rew + eef_forward_grasp_rew
+        # up vector of leg and world up vector should be aligned, and
+        # up vector of leg and forward vector of grip site should be
+        # parallel (close to -1 or 1)
+        grasp_vec = self._get_leg_grasp_vector()
+        rew, eef_up_grasp_dist, eef_forward_grasp_dist = (
+            _reward_kernels.stable_grip_kernel(
+                self._vec_cache[_GRIP_UP],
+                self._vec_cache[_GRIP_FORWARD],
+                grasp_vec,
+                self._rot_dist_coef,
+            )
+        )
+        info.update(
+            {
+                "eef_up_grasp_dist": eef_up_grasp_dist,
+                "eef_up_grasp_rew": self._rot_dist_coef / 3 * (eef_up_grasp_dist - 1),
+                "eef_forward_grasp_dist": eef_forward_grasp_dist,
+                "eef_forward_grasp_rew": (abs(eef_forward_grasp_dist) - 1)
+                * self._rot_dist_coef,
+            }
+        )
         info["stable_grip_succ"] = int(
             eef_up_grasp_dist > 1 - self._rot_threshold
-            and np.abs(eef_forward_grasp_dist) > 1 - self._rot_threshold
+            and abs(eef_forward_grasp_dist) > 1 - self._rot_threshold
         )
-        return rew, info
+        return rew
 
-    def _gripper_penalty(self, ac) -> Tuple[float, dict]:
+    def _gripper_penalty(self, info) -> float:
         """
         Give penalty on status of gripper. Only give it on phases where
         gripper should close
         Returns 0 if gripper is in desired position, range is [-2, 0]
         """
-        if self._discrete_grip:
-            ac = ac.copy()
-            ac[-2] = -1 if ac[-2] < 0 else 1
-        grip_open = self._phases[self._phase_i] in self._grip_open_phases
-        # ac[-2] is -1 for open, 1 for closed
+        # _step stores the applied grip command, so no action copy or
+        # re-discretization is needed here
+        grip = self._last_grip_ac
+        grip_open = self._grip_open_by_phase[self._phase_i]
+        # grip is -1 for open, 1 for closed
         rew = 0
         if not grip_open:
             rew = (
-                -1 - ac[-2] if grip_open else ac[-2] - 1
+                -1 - grip if grip_open else grip - 1
             ) * self._gripper_penalty_coef
         assert rew <= 0
-        info = {"gripper_penalty": rew}
-        return rew, info
-
-    def _ctrl_penalty(self, action) -> Tuple[float, dict]:
-        rew = np.linalg.norm(action[:-2]) * -self._ctrl_penalty_coef
-        info = {"ctrl_penalty": rew}
+        info["gripper_penalty"] = rew
+        return rew
+
+    def _ctrl_penalty(self, action, info) -> float:
+        # sqrt(dot) skips np.linalg.norm's shape handling on the small
+        # action vector
+        ac_sub = action[:-2]
+        rew = math.sqrt(float(ac_sub @ ac_sub)) * -self._ctrl_penalty_coef
+        info["ctrl_penalty"] = rew
         assert rew <= 0
-        return rew, info
+        return rew
 
     def _other_parts_penalty(self) -> Tuple[float, dict]:
         """
@@ -489,17 +662,32 @@ class FurnitureSawyerDenseRewardEnv(FurnitureSawyerEnv):
         assert rew <= 0
         return rew, info
 
-    def _get_gripper_pos(self) -> list:
-        """return 6d pos [griptip, grip] """
-        return np.concatenate(
-            [self._get_pos("griptip_site"), self._get_pos("grip_site")]
-        )
-
-    def _get_fingertip_pos(self) -> list:
-        """return 6d pos [left grip, right grip]"""
-        return np.concatenate(
-            [self._get_pos("lgriptip_site"), self._get_pos("rgriptip_site")]
-        )
+    def _leg_touched(self) -> int:
+        """Returns 1 if both fingers touch the current leg"""
+        left, right = self._finger_contact_by_id(self._leg_body_id)
+        return int(left and right)
+
+    def _get_leg_grasp_pos(self):
+        """Midpoint of the two leg grasp target sites"""
+        return 0.5 * (self._site_cache[_G1] + self._site_cache[_G2])
+
+    def _get_leg_grasp_vector(self):
+        """Vector between the two leg grasp target sites"""
+        return self._site_cache[_G1] - self._site_cache[_G2]
+
+    def _get_gripper_pos(self) -> np.ndarray:
+        """return 6d pos [griptip, grip]; reuses a preallocated buffer"""
+        buf = self._gripper_pos_buf
+        buf[:3] = self._site_cache[_GRIPTIP]
+        buf[3:] = self._site_cache[_GRIP]
+        return buf
+
+    def _get_fingertip_pos(self) -> np.ndarray:
+        """return 6d pos [left grip, right grip]; reuses a preallocated buffer"""
+        buf = self._fingertip_pos_buf
+        buf[:3] = self._site_cache[_LGRIPTIP]
+        buf[3:] = self._site_cache[_RGRIPTIP]
+        return buf
 
 
 def main():